@@ -4,14 +4,20 @@ Color Picker GUI with eyedropper tool.
 Displays Hex, RGB, HSV values.
 """
 
+import os
 import sys
+from functools import lru_cache
+import numpy as np
 from PySide6.QtWidgets import (
     QApplication, QWidget, QPushButton,
     QLabel, QColorDialog, QVBoxLayout,
-    QHBoxLayout, QGridLayout, QDialog
+    QHBoxLayout, QGridLayout, QDialog, QCheckBox
 )
-from PySide6.QtGui import QColor, QPixmap, QFont, QIcon
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QPixmap, QFont, QIcon, QImage
+from PySide6.QtCore import Qt, QTimer
+
+# Optional window icon next to this script (not bundled in the repo)
+ICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icon128.png")
 
 # For color name detection
 try:
@@ -21,18 +27,51 @@ except ImportError:
     webcolors = None
     CSS3_NAMES_TO_HEX = {}
 
+# Exact-match names, so palette colors skip rgb_to_name's ValueError path.
+# Synonyms (aqua/cyan, gray/grey, ...) share one entry named by rgb_to_name,
+# placed at the position of their last spelling. rgb_to_name prefers the
+# "gray" spellings, so near-gray colors show e.g. "dimgray" where the old
+# nearest-name loop showed "dimgrey".
+_CSS3_RGB_TO_NAME = {}
+for _hex in CSS3_NAMES_TO_HEX.values():
+    _rgb = tuple(webcolors.hex_to_rgb(_hex))
+    _CSS3_RGB_TO_NAME.pop(_rgb, None)
+    _CSS3_RGB_TO_NAME[_rgb] = webcolors.rgb_to_name(_rgb)
+
+# CSS3 palette as a contiguous array for nearest-name search, reversed so
+# argmin's first-match tie-break keeps the last palette entry
+_CSS3_NAMES = list(_CSS3_RGB_TO_NAME.values())[::-1]
+_CSS3_RGB = np.array(list(_CSS3_RGB_TO_NAME)[::-1], dtype=np.int32).reshape(-1, 3)
+
+@lru_cache(maxsize=4096)
+def _nearest_css3_name(r: int, g: int, b: int) -> str:
+    d = _CSS3_RGB - np.array([r, g, b], dtype=np.int32)
+    dist = np.einsum('ij,ij->i', d, d)
+    return _CSS3_NAMES[int(dist.argmin())]
+
+# Byte offsets of R, G, B within a Format_RGB32 pixel (0xffRRGGBB)
+_RGB32_CHANNELS = [2, 1, 0] if sys.byteorder == "little" else [1, 2, 3]
+
 class EyeDropperDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, sample_radius=0):
         super().__init__(parent, Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
+        # Box-average radius around the clicked pixel (0 = single pixel)
+        self.sample_radius = sample_radius
         self.setModal(True)
         # Grab screenshot before showing overlay
         screen = QApplication.primaryScreen()
         self.pixmap = screen.grabWindow(0)
-        self.image = self.pixmap.toImage()
-        # Display screenshot scaled to full screen
+        self.pixmap.setDevicePixelRatio(screen.devicePixelRatio())
+        self.image = self.pixmap.toImage().convertToFormat(QImage.Format_RGB32)
+        # Zero-copy NumPy view over the image buffer (rows may be padded)
+        w, h = self.image.width(), self.image.height()
+        buf = np.frombuffer(self.image.constBits(), dtype=np.uint8, count=self.image.sizeInBytes())
+        self._arr = buf.reshape(h, self.image.bytesPerLine())[:, :w * 4].reshape(h, w, 4)
+        # Display screenshot at native size (device pixels map 1:1 to the screen)
         self.label = QLabel(self)
         self.label.setPixmap(self.pixmap)
-        self.label.setScaledContents(True)
+        self.label.setScaledContents(False)
+        self.label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         # Layout to fill entire screen
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -44,30 +83,47 @@ class EyeDropperDialog(QDialog):
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            pos = event.pos()
-            # Map pos to original image coords
-            x = pos.x() * self.image.width() // self.label.width()
-            y = pos.y() * self.image.height() // self.label.height()
+            # Map logical label coords to device pixels in the image
+            pos = self.label.mapFrom(self, event.position())
+            dpr = self.pixmap.devicePixelRatio()
+            x = int(pos.x() * dpr)
+            y = int(pos.y() * dpr)
             x = max(0, min(x, self.image.width() - 1))
             y = max(0, min(y, self.image.height() - 1))
-            pixel = self.image.pixel(x, y)
-            self.selected_color = QColor(pixel)
+            k = self.sample_radius
+            x0, y0 = max(x - k, 0), max(y - k, 0)
+            patch = self._arr[y0:y + k + 1, x0:x + k + 1, _RGB32_CHANNELS].astype(np.uint16)
+            r, g, b = patch.reshape(-1, 3).mean(axis=0).round().astype(np.uint8)
+            self.selected_color = QColor(int(r), int(g), int(b))
         self.accept()
 
 class ColorPicker(QWidget):
+    # Window icon, loaded once on first construction
+    _app_icon = None
+
     def __init__(self):
         super().__init__()
         # Window icon
-        self.setWindowIcon(QIcon(r"d:/Ez-Color-Xs/icon128.png"))
+        if ColorPicker._app_icon is None:
+            ColorPicker._app_icon = QIcon(ICON_PATH)
+        self.setWindowIcon(ColorPicker._app_icon)
         self.setWindowTitle("EZ Color Picker By Xs")
         self.resize(400, 300)
         self.color = QColor(255, 255, 255, 255)
+        # Last color rendered by update_labels
+        self._last_rgba = None
+        # Coalesce rapid color changes into at most ~60 updates per second
+        self._update_timer = QTimer(self)
+        self._update_timer.setInterval(16)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.timeout.connect(self.update_labels)
 
         # Preview
         self.preview = QLabel()
         self.preview.setObjectName("preview")
         self.preview.setFixedSize(150, 150)
-        self.preview.setStyleSheet(f"background-color: {self.color.name().upper()}")
+        # Hex currently applied to the preview stylesheet
+        self._preview_hex = None
 
         # Labels
         self.hex_label = QLabel()
@@ -75,7 +131,6 @@ class ColorPicker(QWidget):
         self.hsl_label = QLabel()
         self.hsv_label = QLabel()
         self.cmyk_label = QLabel()
-        self.hsb_label = QLabel()
         self.decimal_label = QLabel()
         self.name_label = QLabel()
 
@@ -84,11 +139,14 @@ class ColorPicker(QWidget):
         btn_dialog.clicked.connect(self.open_color_dialog)
         btn_eyedrop = QPushButton("Eyedropper")
         btn_eyedrop.clicked.connect(self.open_eyedropper)
+        # Opt-in 5x5 box average for the eyedropper
+        self.average_check = QCheckBox("Average 5x5")
 
         # Layout
         btn_layout = QHBoxLayout()
         btn_layout.addWidget(btn_dialog)
         btn_layout.addWidget(btn_eyedrop)
+        btn_layout.addWidget(self.average_check)
 
         # Main layout: preview and data
         main_layout = QVBoxLayout(self)
@@ -100,45 +158,25 @@ class ColorPicker(QWidget):
         data_layout.setColumnStretch(1, 1)
         data_layout.setHorizontalSpacing(20)
         data_layout.setVerticalSpacing(10)
-        # Create copy buttons for each property
-        self.hex_copy_btn = QPushButton("Copy")
-        self.hex_copy_btn.setFixedSize(24, 24)
-        self.hex_copy_btn.clicked.connect(lambda _, lbl=self.hex_label: QApplication.clipboard().setText(lbl.text()))
-        self.rgb_copy_btn = QPushButton("Copy")
-        self.rgb_copy_btn.setFixedSize(24, 24)
-        self.rgb_copy_btn.clicked.connect(lambda _, lbl=self.rgb_label: QApplication.clipboard().setText(lbl.text()))
-        self.hsl_copy_btn = QPushButton("Copy")
-        self.hsl_copy_btn.setFixedSize(24, 24)
-        self.hsl_copy_btn.clicked.connect(lambda _, lbl=self.hsl_label: QApplication.clipboard().setText(lbl.text()))
-        self.hsv_copy_btn = QPushButton("Copy")
-        self.hsv_copy_btn.setFixedSize(24, 24)
-        self.hsv_copy_btn.clicked.connect(lambda _, lbl=self.hsv_label: QApplication.clipboard().setText(lbl.text()))
-        self.cmyk_copy_btn = QPushButton("Copy")
-        self.cmyk_copy_btn.setFixedSize(24, 24)
-        self.cmyk_copy_btn.clicked.connect(lambda _, lbl=self.cmyk_label: QApplication.clipboard().setText(lbl.text()))
-        self.hsb_copy_btn = QPushButton("Copy")
-        self.hsb_copy_btn.setFixedSize(24, 24)
-        self.hsb_copy_btn.clicked.connect(lambda _, lbl=self.hsb_label: QApplication.clipboard().setText(lbl.text()))
-        self.decimal_copy_btn = QPushButton("Copy")
-        self.decimal_copy_btn.setFixedSize(24, 24)
-        self.decimal_copy_btn.clicked.connect(lambda _, lbl=self.decimal_label: QApplication.clipboard().setText(lbl.text()))
-        self.name_copy_btn = QPushButton("Copy")
-        self.name_copy_btn.setFixedSize(24, 24)
-        self.name_copy_btn.clicked.connect(lambda _, lbl=self.name_label: QApplication.clipboard().setText(lbl.text()))
-        # Populate grid
+        # Populate grid with a copy button per property
         fields = [
-            ("HEX", self.hex_label, self.hex_copy_btn),
-            ("RGB", self.rgb_label, self.rgb_copy_btn),
-            ("HSL", self.hsl_label, self.hsl_copy_btn),
-            ("HSV", self.hsv_label, self.hsv_copy_btn),
-            ("CMYK", self.cmyk_label, self.cmyk_copy_btn),
-            ("HSB", self.hsb_label, self.hsb_copy_btn),
-            ("Decimal", self.decimal_label, self.decimal_copy_btn),
-            ("Name", self.name_label, self.name_copy_btn),
+            ("HEX", self.hex_label),
+            ("RGB", self.rgb_label),
+            ("HSL", self.hsl_label),
+            ("HSV", self.hsv_label),
+            ("CMYK", self.cmyk_label),
+            ("Decimal", self.decimal_label),
+            ("Name", self.name_label),
         ]
-        for i, (title, label, btn) in enumerate(fields):
+        bold_font = QFont()
+        bold_font.setBold(True)
+        for i, (title, label) in enumerate(fields):
             title_lbl = QLabel(f"{title}:")
-            title_lbl.setFont(QFont('', weight=QFont.Bold))
+            title_lbl.setFont(bold_font)
+            btn = QPushButton("Copy")
+            btn.setFixedSize(24, 24)
+            btn.setProperty("target_label", label)
+            btn.clicked.connect(self._copy_from_sender)
             data_layout.addWidget(title_lbl, i, 0)
             data_layout.addWidget(label, i, 1)
             data_layout.addWidget(btn, i, 2)
@@ -155,70 +193,87 @@ class ColorPicker(QWidget):
         self.update_labels()
 
     def update_labels(self):
+        # Skip the update when the color hasn't changed
+        rgba = self.color.rgba()
+        if rgba == self._last_rgba:
+            return
+        self._last_rgba = rgba
         r = self.color.red()
         g = self.color.green()
         b = self.color.blue()
         a = self.color.alpha()
         # Normalized RGB
         r_norm, g_norm, b_norm = r/255.0, g/255.0, b/255.0
-        # HSV
-        h_hsv, s_hsv, v_hsv, _ = self.color.getHsv()
+        # HSV (hue is shared with HSL)
+        h, s_hsv, v_hsv, _ = self.color.getHsv()
         s_hsv_pct = s_hsv / 2.55
         v_hsv_pct = v_hsv / 2.55
         # HSL
-        h_hsl, s_hsl, l, _ = self.color.getHsl()
+        _, s_hsl, l, _ = self.color.getHsl()
         s_hsl_pct = s_hsl / 2.55
         l_pct = l / 2.55
         # CMYK
         k = 1 - max(r_norm, g_norm, b_norm)
         if k < 1:
-            c = (1 - r_norm - k) / (1 - k)
-            m = (1 - g_norm - k) / (1 - k)
-            y = (1 - b_norm - k) / (1 - k)
+            denom = 1 - k
+            c = (1 - r_norm - k) / denom
+            m = (1 - g_norm - k) / denom
+            y = (1 - b_norm - k) / denom
         else:
             c = m = y = 0
         c_pct, m_pct, y_pct, k_pct = c*100, m*100, y*100, k*100
-        # Decimal
-        decimal_val = (r << 16) + (g << 8) + b
+        # Decimal and Hex from one packed value
+        decimal_val = (r << 16) | (g << 8) | b
+        hex_rgb = "#%06X" % decimal_val
         # Color Name
         if webcolors:
-            try:
-                name = webcolors.rgb_to_name((r, g, b))
-            except ValueError:
-                min_colours = {}
-                for key, hex_val in CSS3_NAMES_TO_HEX.items():
-                    r_c, g_c, b_c = webcolors.hex_to_rgb(hex_val)
-                    dist = (r_c - r)**2 + (g_c - g)**2 + (b_c - b)**2
-                    min_colours[dist] = key
-                name = min_colours[min(min_colours.keys())]
+            name = _CSS3_RGB_TO_NAME.get((r, g, b)) or _nearest_css3_name(r, g, b)
         else:
             name = "Unknown"
-        # Hex and Preview
-        hex_rgb = f"#{r:02X}{g:02X}{b:02X}"
-        self.preview.setStyleSheet(f"background-color: {hex_rgb}")
+        # Preview
+        if hex_rgb != self._preview_hex:
+            self.preview.setStyleSheet(f"background-color: {hex_rgb}")
+            self._preview_hex = hex_rgb
         # Set Labels
         self.hex_label.setText(f"HEX: {hex_rgb}")
         self.rgb_label.setText(f"RGB: {r}, {g}, {b}")
-        self.hsl_label.setText(f"HSL: {h_hsl}°, {s_hsl_pct:.1f}%, {l_pct:.1f}%")
-        self.hsv_label.setText(f"HSV: {h_hsv}°, {s_hsv_pct:.1f}%, {v_hsv_pct:.1f}%")
+        self.hsl_label.setText(f"HSL: {h}°, {s_hsl_pct:.1f}%, {l_pct:.1f}%")
+        self.hsv_label.setText(f"HSV: {h}°, {s_hsv_pct:.1f}%, {v_hsv_pct:.1f}%")
         self.cmyk_label.setText(f"CMYK: {c_pct:.1f}%, {m_pct:.1f}%, {y_pct:.1f}%, {k_pct:.1f}%")
-        self.hsb_label.setText(f"HSB: {h_hsv}°, {s_hsv_pct:.1f}%, {v_hsv_pct:.1f}%")
         self.decimal_label.setText(f"Decimal: {decimal_val}")
         self.name_label.setText(f"Name: {name}")
 
+    def _copy_from_sender(self):
+        QApplication.clipboard().setText(self.sender().property("target_label").text())
+
+    def _schedule_update(self):
+        # Leave a pending update running so dragging doesn't postpone it
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def _preview_color(self, col):
+        self.color = col
+        self._schedule_update()
+
     def open_color_dialog(self):
-        col = QColorDialog.getColor(self.color, self, options=QColorDialog.ShowAlphaChannel)
+        original = QColor(self.color)
+        dlg = QColorDialog(self.color, self)
+        dlg.setOption(QColorDialog.ShowAlphaChannel)
+        # Live preview while the user drags in the dialog
+        dlg.currentColorChanged.connect(self._preview_color)
+        col = dlg.selectedColor() if dlg.exec() else original
+        dlg.deleteLater()
         if col.isValid():
             self.color = col
-            self.update_labels()
+            self._schedule_update()
 
     def open_eyedropper(self):
         self.hide()
-        dlg = EyeDropperDialog(self)
+        dlg = EyeDropperDialog(self, sample_radius=2 if self.average_check.isChecked() else 0)
         if dlg.exec():
             if dlg.selected_color:
                 self.color = dlg.selected_color
-                self.update_labels()
+                self._schedule_update()
         self.show()
 
 if __name__ == "__main__":